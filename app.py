@@ -1,11 +1,20 @@
 ﻿import os
 from datetime import datetime 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response
+import time
+import sqlite3
+import threading
+import tempfile
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response, g, current_app, has_app_context, has_request_context
 from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 import docx 
 from functools import wraps
+from heapq import merge
+from concurrent.futures import ThreadPoolExecutor
+from flask_caching import Cache
+from sqlalchemy import func, case, event, delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import joinedload, defer
 
 # Project internal imports
 from config import Config
@@ -24,13 +33,132 @@ from services.notification_service import NotificationService
 from services.activity_service import ActivityService
 from services.feedback_service import FeedbackService
 from services.goal_service import GoalService
-from services.stats_service import StatsService
+from services.stats_service import StatsService, to_date
 from services.report_service import ReportService
+from services.password_service import PasswordService
 from repositories.quiz_repository import QuizRepository
 from repositories.grade_repository import GradeRepository
 from repositories.activity_repository import ActivityRepository
 from repositories.goal_repository import GoalRepository
-from repositories.feedback_repository import FeedbackRepository
+
+cache = Cache()
+
+# Endpoints reachable without logging in
+_PUBLIC_ROUTES = frozenset({'login', 'register', 'static', 'privacy', 'terms'})
+
+# Most answers /quiz/check_batch will check in one request
+_MAX_BATCH_ANSWERS = 50
+
+# Background worker pool for AI grading, so uploads do not wait on the Gemini call
+executor = ThreadPoolExecutor(max_workers=4)
+
+# Submission ids queued or running on the executor, so no submission is graded twice at once
+_grading_in_flight = set()
+_grading_lock = threading.Lock()
+
+def claim_for_grading(submission_ids):
+    """
+    Mark submissions as being graded; returns only the ids that were not already in flight
+    """
+    with _grading_lock:
+        claimed = [sub_id for sub_id in submission_ids if sub_id not in _grading_in_flight]
+        _grading_in_flight.update(claimed)
+    return claimed
+
+def release_grading(submission_ids):
+    with _grading_lock:
+        _grading_in_flight.difference_update(submission_ids)
+
+# Separate small pool for upload writes, so they never queue behind slow AI calls
+file_executor = ThreadPoolExecutor(max_workers=2)
+
+def persist_upload(file_path, data):
+    """
+    Write uploaded bytes to disk atomically (runs on file_executor); returns True once the file is in place
+    """
+    tmp_path = None
+    try:
+        # Unique temp name in the same directory, so concurrent uploads of one filename don't collide
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600 files; keep the usual permissions so the static server can read it
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, file_path)
+        return True
+    except OSError as e:
+        print(f"Failed to save upload {file_path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+# --- SQLITE TUNING ---
+# WAL lets page reads continue while background grading writes; NORMAL sync is safe under WAL
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    if not isinstance(dbapi_conn, sqlite3.Connection):
+        return
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.close()
+
+# --- QUERY OBSERVABILITY ---
+# Count queries per request and flag slow ones, so N+1 regressions show up in the log
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info['query_start_time'].pop()) * 1000
+    if not has_app_context():
+        return
+    if elapsed_ms > current_app.config['SLOW_QUERY_MS']:
+        current_app.logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement)
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+        g.query_time_ms = g.get('query_time_ms', 0.0) + elapsed_ms
+        g.setdefault('query_statements', []).append(statement)
+
+def init_db():
+    """
+    Create tables and bring an existing SQLite database up to date.
+    Must be called inside an application context.
+    """
+    db.create_all()
+
+    # --- Ensure new optional User columns exist (safe for existing SQLite DB) ---
+    from sqlalchemy import text
+    insp = db.inspect(db.engine)
+    existing_cols = {col['name'] for col in insp.get_columns('users')}
+
+    # Helper to add column only if it does not exist
+    def _add_column_if_missing(column_name: str, ddl: str):
+        if column_name not in existing_cols:
+            db.session.execute(text(f"ALTER TABLE users ADD COLUMN {ddl}"))
+            db.session.commit()
+
+    # New profile / personal info fields
+    _add_column_if_missing('profile_image', 'profile_image VARCHAR(200)')
+    _add_column_if_missing('bio', 'bio TEXT')
+    _add_column_if_missing('university', 'university VARCHAR(120)')
+    _add_column_if_missing('grade', 'grade VARCHAR(50)')
+    _add_column_if_missing('teacher', 'teacher VARCHAR(120)')
+    _add_column_if_missing('phone', 'phone VARCHAR(50)')
+    _add_column_if_missing('education_status', 'education_status VARCHAR(80)')
+
+    # AI preference fields
+    _add_column_if_missing('ai_tone', 'ai_tone VARCHAR(20)')
+    _add_column_if_missing('ai_speed', 'ai_speed FLOAT')
+    _add_column_if_missing('weekly_report', 'weekly_report BOOLEAN DEFAULT 1')
+
+    # create_all() skips existing tables, so add query indexes to older databases too
+    for model in (Submission, Quiz, LearningActivity):
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
 
 def create_app():
     app = Flask(__name__)
@@ -39,6 +167,9 @@ def create_app():
     # Initialize Database
     db.init_app(app)
 
+    # Initialize Cache
+    cache.init_app(app)
+
     # Login Manager Setup
     login_manager = LoginManager()
     login_manager.login_view = 'login' 
@@ -46,58 +177,72 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
 
     # --- GLOBAL USER INJECTION ---
     @app.context_processor
     def inject_user():
         return dict(user=current_user)
 
-    # Configure Upload Folder
+    # Configure Upload Folders
     UPLOAD_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'static/uploads')
+    PROFILE_PICS_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'static/profile_pics')
     app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True) 
-
-    # Create Database Tables
-    with app.app_context():
-        db.create_all()
-
-        # --- Ensure new optional User columns exist (safe for existing SQLite DB) ---
-        from sqlalchemy import text
-        insp = db.inspect(db.engine)
-        existing_cols = {col['name'] for col in insp.get_columns('users')}
-
-        # Helper to add column only if it does not exist
-        def _add_column_if_missing(column_name: str, ddl: str):
-            if column_name not in existing_cols:
-                db.session.execute(text(f"ALTER TABLE users ADD COLUMN {ddl}"))
-                db.session.commit()
-
-        # New profile / personal info fields
-        _add_column_if_missing('profile_image', 'profile_image VARCHAR(200)')
-        _add_column_if_missing('bio', 'bio TEXT')
-        _add_column_if_missing('university', 'university VARCHAR(120)')
-        _add_column_if_missing('grade', 'grade VARCHAR(50)')
-        _add_column_if_missing('teacher', 'teacher VARCHAR(120)')
-        _add_column_if_missing('phone', 'phone VARCHAR(50)')
-        _add_column_if_missing('education_status', 'education_status VARCHAR(80)')
+    app.config['PROFILE_PICS_FOLDER'] = PROFILE_PICS_FOLDER
+    for folder in (UPLOAD_FOLDER, PROFILE_PICS_FOLDER):
+        os.makedirs(folder, exist_ok=True)
 
-        # AI preference fields
-        _add_column_if_missing('ai_tone', 'ai_tone VARCHAR(20)')
-        _add_column_if_missing('ai_speed', 'ai_speed FLOAT')
-        _add_column_if_missing('weekly_report', 'weekly_report BOOLEAN DEFAULT 1')
+    # Schema setup runs from `flask init-db` (or `python app.py`), not on every worker boot
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create database tables and apply column/index migrations."""
+        init_db()
+        print("Database initialized.")
 
     # --- AUTHENTICATION CHECK & CACHE CONTROL ---
     @app.before_request
     def check_user_auth():
-        public_routes = ['login', 'register', 'static', 'privacy', 'terms']
-        if not current_user.is_authenticated and request.endpoint not in public_routes:
+        # Check the endpoint first so public routes never trigger the user loader
+        endpoint = request.endpoint
+        if endpoint is None or endpoint in _PUBLIC_ROUTES:
+            return
+        if not current_user.is_authenticated:
             return redirect(url_for('login'))
 
+    @app.after_request
+    def check_query_budget(response):
+        query_count = g.get('query_count', 0)
+        if app.debug:
+            # Surface every request's SQL count while developing
+            response.headers['X-SQL-Count'] = str(query_count)
+            app.logger.debug("%s: %d queries", request.path, query_count)
+        if query_count > app.config['QUERY_COUNT_WARN']:
+            app.logger.warning(
+                "%s issued %d queries (%.1f ms):\n%s",
+                request.path, query_count, g.get('query_time_ms', 0.0),
+                "\n".join(g.get('query_statements', []))
+            )
+        return response
+
     @app.after_request
     def add_header(response):
+        if request.endpoint == 'static':
+            # Versioned static URLs never change content; unversioned ones revalidate via ETag/Last-Modified
+            if 'v' in request.args:
+                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            else:
+                response.headers["Cache-Control"] = "no-cache"
+            return response
         response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
         return response
+
+    @app.url_defaults
+    def add_static_version(endpoint, values):
+        # Append the file's mtime to static URLs so edited or re-uploaded files get a new URL
+        if endpoint == 'static' and 'filename' in values:
+            file_path = os.path.join(app.static_folder, values['filename'])
+            if os.path.isfile(file_path):
+                values['v'] = int(os.path.getmtime(file_path))
     
     # Role Based Access Decorator
     def role_required(role):
@@ -128,7 +273,7 @@ def create_app():
         if User.query.filter_by(email=email).first():
             flash("Email already exists!", "danger")
             return redirect(url_for('login'))
-        hashed_pw = generate_password_hash(password, method='pbkdf2:sha256')
+        hashed_pw = PasswordService.hash_password(password)
         new_user = User(username=username, email=email, password=hashed_pw, role=role)
         db.session.add(new_user)
         db.session.commit()
@@ -140,7 +285,12 @@ def create_app():
         if current_user.is_authenticated: return redirect(url_for('dashboard'))
         if request.method == 'POST':
             user = User.query.filter_by(email=request.form.get('email')).first()
-            if user and check_password_hash(user.password, request.form.get('password')):
+            password = request.form.get('password')
+            if user and PasswordService.verify_password(user.password, password):
+                # Transparently upgrade legacy pbkdf2 hashes to Argon2id
+                if PasswordService.needs_rehash(user.password):
+                    user.password = PasswordService.hash_password(password)
+                    db.session.commit()
                 login_user(user)
                 return redirect(url_for('dashboard'))
             flash("Invalid credentials.", "danger")
@@ -152,68 +302,97 @@ def create_app():
         logout_user()
         return redirect(url_for('login'))
 
-    @app.route('/dashboard')
-    @login_required
-    def dashboard():
-        if current_user.role == 'Instructor':
-            return redirect(url_for('instructor_dashboard'))
-        
+    # --- DASHBOARD CACHE ---
+    def dashboard_watermark(student_id):
+        # A new submission, quiz or grade (including an adjusted score) moves the watermark, so stale
+        # cache entries are never read even when another worker did the grading
+        latest_submission = db.session.query(func.max(Submission.created_at)).filter(Submission.student_id == student_id).scalar_subquery()
+        latest_quiz = db.session.query(func.max(Quiz.date_taken)).filter(Quiz.user_id == student_id).scalar_subquery()
+        grades = db.session.query(Grade).join(Submission).filter(Submission.student_id == student_id)
+        grade_count = grades.with_entities(func.count(Grade.id)).scalar_subquery()
+        grade_total = grades.with_entities(func.sum(Grade.score)).scalar_subquery()
+        return tuple(db.session.query(latest_submission, latest_quiz, grade_count, grade_total).one())
+
+    def invalidate_dashboard(student_id):
+        # Call after any submission or grade change: refreshes stored stats and drops cached aggregates
+        StatsService.refresh_user_stats(student_id)
+        cache.delete_memoized(_compute_dashboard, student_id, dashboard_watermark(student_id))
+        cache.delete_memoized(_compute_instructor_dashboard)
+
+    @cache.memoize(timeout=300)
+    def _compute_dashboard(student_id, watermark):
+        """
+        Compute the student dashboard aggregates.
+        Returns plain values only so the result can be cached between requests.
+        """
         from datetime import timedelta
         
-        # Get all submissions
-        submissions = Submission.query.filter_by(student_id=current_user.id).order_by(Submission.created_at.asc()).all()
-        
-        # Calculate Speaking Score (average of pronunciation_score and fluency_score)
-        speaking_subs = [s for s in submissions if s.submission_type == 'SPEAKING' and s.grade]
-        speaking_score = 0.0
-        if speaking_subs:
-            scores = []
-            for sub in speaking_subs:
-                if sub.grade.pronunciation_score and sub.grade.fluency_score:
-                    scores.append((sub.grade.pronunciation_score + sub.grade.fluency_score) / 2)
-            speaking_score = round(sum(scores) / len(scores), 1) if scores else 0.0
+        today = datetime.utcnow().date()
+        week_start = today - timedelta(days=today.weekday())  # Monday of current week
         
-        # Calculate Writing Score (average of writing submissions)
-        writing_subs = [s for s in submissions if s.submission_type == 'WRITING' and s.grade]
-        writing_score = round(sum(s.grade.score for s in writing_subs) / len(writing_subs), 1) if writing_subs else 0.0
+        # Speaking composite is the average of pronunciation_score and fluency_score
+        speaking_composite = (Grade.pronunciation_score + Grade.fluency_score) / 2
+        submission_day = func.date(Submission.created_at)
+        
+        # Headline averages and counts come from the precomputed per-student stats row
+        user_stats = StatsService.get_user_stats(student_id)
+        summary = StatsService.get_dashboard_data(student_id)
+        speaking_score = summary['speaking_score']
+        writing_score = summary['writing_score']
+        handwritten_score = summary['handwritten_score']
+        
+        # Per-date averages for the chart: one row per (date, submission type)
+        daily_rows = db.session.query(
+            submission_day,
+            Submission.submission_type,
+            func.avg(Grade.score),
+            func.avg(speaking_composite)
+        ).join(Grade).filter(
+            Submission.student_id == student_id
+        ).group_by(submission_day, Submission.submission_type).order_by(submission_day).all()
+        
+        submission_dates = {}  # insertion-ordered, rows arrive sorted by day
+        speaking_by_date = {}
+        writing_by_date = {}
+        handwritten_by_date = {}
+        date_buckets = {'SPEAKING': speaking_by_date, 'WRITING': writing_by_date, 'HANDWRITTEN': handwritten_by_date}
+        for day, sub_type, score_avg, composite_avg in daily_rows:
+            bucket = date_buckets.get(sub_type)
+            value = composite_avg if sub_type == 'SPEAKING' else score_avg
+            if bucket is not None and value is not None:
+                day = to_date(day)
+                bucket[day] = value
+                submission_dates[day] = None
         
         # Calculate Quiz Progress
-        all_quizzes = Quiz.query.filter_by(user_id=current_user.id).all()
-        completed_quizzes = len(all_quizzes)
+        completed_quizzes = summary['completed_quizzes']
         quiz_progress = completed_quizzes  # Can be enhanced with total available quizzes
+        quiz_score = summary['quiz_score']
+        
+        quiz_day = func.date(Quiz.date_taken)
+        quiz_by_date = {
+            to_date(day): score_avg
+            for day, score_avg in db.session.query(quiz_day, func.avg(Quiz.score)).filter(
+                Quiz.user_id == student_id,
+                Quiz.date_taken.isnot(None),
+                Quiz.score.isnot(None)
+            ).group_by(quiz_day).order_by(quiz_day).all()
+        }
         
-        # Calculate Current Streak (consecutive days with submissions)
-        current_streak = 0
-        if submissions:
-            # Get unique submission dates
-            submission_dates = set()
-            for sub in submissions:
-                submission_dates.add(sub.created_at.date())
-            
-            # Calculate streak backwards from today
-            today = datetime.utcnow().date()
-            check_date = today
-            while check_date in submission_dates:
-                current_streak += 1
-                check_date -= timedelta(days=1)
+        # Calculate Current Streak (consecutive days with submissions), backwards from today
+        current_streak = user_stats.current_streak if user_stats.last_submission_date == today else 0
         
         # Calculate Weekly Goal Progress
-        today = datetime.utcnow().date()
-        week_start = today - timedelta(days=today.weekday())  # Monday of current week
-        weekly_submissions = [s for s in submissions if s.created_at.date() >= week_start]
-        weekly_goal_current = len(weekly_submissions)
+        week_start_dt = datetime.combine(week_start, datetime.min.time())
+        weekly_goal_current = db.session.query(func.count(Submission.id)).filter(
+            Submission.student_id == student_id,
+            Submission.created_at >= week_start_dt
+        ).scalar()
         weekly_goal_target = 5  # Default weekly goal
         weekly_goal_percentage = min(100, int((weekly_goal_current / weekly_goal_target) * 100)) if weekly_goal_target > 0 else 0
         weekly_goal_remaining = max(0, weekly_goal_target - weekly_goal_current)
         
-        # Get recent submissions for the chart
-        recent_submissions = submissions[-10:] if len(submissions) > 10 else submissions
-        
-        # Calculate Handwritten Score
-        handwritten_subs = [s for s in submissions if s.submission_type == 'HANDWRITTEN' and s.grade]
-        
         # Prepare multi-line chart data: Speaking, Writing, Quiz, Handwritten scores by date
-        from collections import defaultdict
         chart_data = {
             'dates': [],
             'speaking_scores': [],
@@ -222,112 +401,16 @@ def create_app():
             'handwritten_scores': []
         }
         
-        # Get Handwritten submissions
-        handwritten_subs = [s for s in submissions if s.submission_type == 'HANDWRITTEN' and s.grade]
-        
-        # Collect all dates from submissions and quizzes
-        all_dates = set()
-        
-        # Speaking submissions with dates
-        for sub in speaking_subs:
-            if sub.grade and sub.grade.pronunciation_score is not None and sub.grade.fluency_score is not None:
-                date_key = sub.created_at.date()
-                all_dates.add(date_key)
-        
-        # Writing submissions with dates
-        for sub in writing_subs:
-            if sub.grade and sub.grade.score is not None:
-                date_key = sub.created_at.date()
-                all_dates.add(date_key)
-        
-        # Handwritten submissions with dates
-        for sub in handwritten_subs:
-            if sub.grade and sub.grade.score is not None:
-                date_key = sub.created_at.date()
-                all_dates.add(date_key)
-        
-        # Quiz submissions with dates
-        for quiz in all_quizzes:
-            if quiz.date_taken and quiz.score is not None:
-                date_key = quiz.date_taken.date() if isinstance(quiz.date_taken, datetime) else quiz.date_taken
-                all_dates.add(date_key)
-        
-        # Sort dates
-        sorted_dates = sorted(all_dates)
-        
-        # Create date-indexed dictionaries
-        speaking_by_date = {}
-        writing_by_date = {}
-        handwritten_by_date = {}
-        quiz_by_date = {}
+        # Both date sources are already ordered by SQL; merge them and drop duplicates
+        sorted_dates = list(dict.fromkeys(merge(submission_dates, quiz_by_date)))
         
-        for sub in speaking_subs:
-            if sub.grade and sub.grade.pronunciation_score is not None and sub.grade.fluency_score is not None:
-                date_key = sub.created_at.date()
-                score = (sub.grade.pronunciation_score + sub.grade.fluency_score) / 2
-                if date_key not in speaking_by_date:
-                    speaking_by_date[date_key] = []
-                speaking_by_date[date_key].append(score)
-        
-        for sub in writing_subs:
-            if sub.grade and sub.grade.score is not None:
-                date_key = sub.created_at.date()
-                if date_key not in writing_by_date:
-                    writing_by_date[date_key] = []
-                writing_by_date[date_key].append(sub.grade.score)
-        
-        for sub in handwritten_subs:
-            if sub.grade and sub.grade.score is not None:
-                date_key = sub.created_at.date()
-                if date_key not in handwritten_by_date:
-                    handwritten_by_date[date_key] = []
-                handwritten_by_date[date_key].append(sub.grade.score)
-        
-        for quiz in all_quizzes:
-            if quiz.date_taken and quiz.score is not None:
-                date_key = quiz.date_taken.date() if isinstance(quiz.date_taken, datetime) else quiz.date_taken
-                if date_key not in quiz_by_date:
-                    quiz_by_date[date_key] = []
-                quiz_by_date[date_key].append(quiz.score)
-        
-        # Average scores per date and build chart data
+        # Build chart data from the per-date averages (0 instead of None for better chart display)
         for date in sorted_dates:
             chart_data['dates'].append(date.strftime('%d %b'))
-            
-            # Speaking: average if multiple submissions on same date
-            if date in speaking_by_date:
-                chart_data['speaking_scores'].append(round(sum(speaking_by_date[date]) / len(speaking_by_date[date]), 1))
-            else:
-                chart_data['speaking_scores'].append(0)  # Use 0 instead of None for better chart display
-            
-            # Writing: average if multiple submissions on same date
-            if date in writing_by_date:
-                chart_data['writing_scores'].append(round(sum(writing_by_date[date]) / len(writing_by_date[date]), 1))
-            else:
-                chart_data['writing_scores'].append(0)  # Use 0 instead of None
-            
-            # Handwritten: average if multiple submissions on same date
-            if date in handwritten_by_date:
-                chart_data['handwritten_scores'].append(round(sum(handwritten_by_date[date]) / len(handwritten_by_date[date]), 1))
-            else:
-                chart_data['handwritten_scores'].append(0)  # Use 0 instead of None
-            
-            # Quiz: average if multiple quizzes on same date
-            if date in quiz_by_date:
-                chart_data['quiz_scores'].append(round(sum(quiz_by_date[date]) / len(quiz_by_date[date]), 1))
-            else:
-                chart_data['quiz_scores'].append(0)  # Use 0 instead of None
-        
-        # Calculate Handwritten Score for insights
-        handwritten_score = 0.0
-        if handwritten_subs:
-            handwritten_score = round(sum(s.grade.score for s in handwritten_subs) / len(handwritten_subs), 1)
-        
-        # Calculate Quiz Score for insights
-        quiz_score = 0.0
-        if all_quizzes:
-            quiz_scores_list = [q.score for q in all_quizzes if q.score is not None]
-            quiz_score = round(sum(quiz_scores_list) / len(quiz_scores_list), 1) if quiz_scores_list else 0.0
+            chart_data['speaking_scores'].append(round(speaking_by_date[date], 1) if date in speaking_by_date else 0)
+            chart_data['writing_scores'].append(round(writing_by_date[date], 1) if date in writing_by_date else 0)
+            chart_data['handwritten_scores'].append(round(handwritten_by_date[date], 1) if date in handwritten_by_date else 0)
+            chart_data['quiz_scores'].append(round(quiz_by_date[date], 1) if date in quiz_by_date else 0)
         
         # Determine AI Performance Insights (Strongest and Weakest areas)
         area_scores = {
@@ -355,10 +438,10 @@ def create_app():
         # Determine Recommended Next Step
         recommended_next = "Start Your First Activity"
         recommended_link = "/assignments"
-        if not speaking_subs:
+        if not user_stats.speaking_graded:
             recommended_next = "Improve Your Speaking"
             recommended_link = "/speaking"
-        elif not writing_subs:
+        elif not user_stats.writing_count:
             recommended_next = "Improve Your Writing"
             recommended_link = "/submit/writing"
         elif speaking_score < 70:
@@ -371,56 +454,62 @@ def create_app():
             recommended_next = "Take a Quiz"
             recommended_link = "/quizzes"
         
-        # Get latest graded submission for recommendations
-        latest_graded = Submission.query.filter_by(student_id=current_user.id).join(Grade).order_by(Submission.created_at.desc()).first()
+        total_submissions = summary['total_submissions']
+        
+        # Calculate average score across all graded submissions
+        avg_score = round(user_stats.graded_sum / user_stats.graded_count, 1) if user_stats.graded_count else 0.0
+        
+        return dict(
+            speaking_score=speaking_score,
+            writing_score=writing_score,
+            quiz_progress=quiz_progress,
+            current_streak=current_streak,
+            weekly_goal_current=weekly_goal_current,
+            weekly_goal_target=weekly_goal_target,
+            weekly_goal_percentage=weekly_goal_percentage,
+            weekly_goal_remaining=weekly_goal_remaining,
+            recommended_next=recommended_next,
+            recommended_link=recommended_link,
+            has_chart_data=total_submissions > 0,
+            chart_data=chart_data,
+            total_submissions=total_submissions,
+            average_score=avg_score,
+            strongest_area=strongest_area,
+            strongest_score=strongest_score,
+            weakest_area=weakest_area,
+            weakest_score=weakest_score
+        )
+
+    @app.route('/dashboard')
+    @login_required
+    def dashboard():
+        if current_user.role == 'Instructor':
+            return redirect(url_for('instructor_dashboard'))
+        
+        # Aggregates are cached per student until a new submission or quiz arrives
+        stats = _compute_dashboard(current_user.id, dashboard_watermark(current_user.id))
+        
+        # The template only renders the most recent submission with its grade
+        latest_submissions = Submission.query.options(defer(Submission.text_content), joinedload(Submission.grade)).filter_by(student_id=current_user.id).order_by(Submission.created_at.desc()).limit(1).all()
         
-        # Get recommendations using StatsService
-        recommendations = StatsService.fetch_recommendations(current_user.id)
+        # Get latest graded submission for recommendations
+        latest_graded = Submission.query.options(defer(Submission.text_content), joinedload(Submission.grade)).filter_by(student_id=current_user.id).join(Grade).order_by(Submission.created_at.desc()).first()
         
         # Get user goals using GoalService
         user_goals = GoalService.get_user_goals(current_user.id)[:2]
         
         # Calculate pending tasks (all activities - in a real app, these would be filtered by student assignments)
         # For now, we'll count activities with future due dates
-        pending_activities = LearningActivity.query.filter(
+        pending_count = db.session.query(func.count(LearningActivity.id)).filter(
             LearningActivity.due_date >= datetime.utcnow()
-        ).order_by(LearningActivity.due_date.asc()).all()
-        pending_count = len(pending_activities)
-        
-        # Calculate total submissions
-        total_submissions = len(submissions)
-        
-        # Calculate average score across all graded submissions
-        graded_subs = [s for s in submissions if s.grade]
-        avg_score = round(sum(s.grade.score for s in graded_subs) / len(graded_subs), 1) if graded_subs else 0.0
+        ).scalar()
         
         return render_template('dashboard.html', 
-                               submissions=submissions,
-                               recent_submissions=recent_submissions,
-                               speaking_score=speaking_score,
-                               writing_score=writing_score,
-                               quiz_progress=quiz_progress,
-                               current_streak=current_streak,
-                               weekly_goal_current=weekly_goal_current,
-                               weekly_goal_target=weekly_goal_target,
-                               weekly_goal_percentage=weekly_goal_percentage,
-                               weekly_goal_remaining=weekly_goal_remaining,
-                               recommended_next=recommended_next,
-                               recommended_link=recommended_link,
+                               submissions=latest_submissions,
                                latest_graded=latest_graded,
                                goals=user_goals,
-                               speaking_subs=speaking_subs,
-                               writing_subs=writing_subs,
-                               has_chart_data=len(recent_submissions) > 0,
-                               chart_data=chart_data,
                                pending_count=pending_count,
-                               total_submissions=total_submissions,
-                               average_score=avg_score,
-                               strongest_area=strongest_area,
-                               strongest_score=strongest_score,
-                               weakest_area=weakest_area,
-                               weakest_score=weakest_score,
-                               recommendations=recommendations)
+                               **stats)
 
     @app.route('/assignments')
     @login_required
@@ -429,11 +518,13 @@ def create_app():
         now = datetime.utcnow()
 
         # Student submissions to mark completed assignments (including quiz submissions)
-        user_subs = Submission.query.filter_by(student_id=current_user.id).all()
-        completed_ids = set(s.activity_id for s in user_subs if s.activity_id)
+        completed_ids = {activity_id for (activity_id,) in db.session.query(Submission.activity_id).filter(
+            Submission.student_id == current_user.id,
+            Submission.activity_id.isnot(None)
+        ).distinct()}
 
         all_count = len(activities)
-        completed_count = len([a for a in activities if a.id in completed_ids])
+        completed_count = sum(1 for a in activities if a.id in completed_ids)
         pending_count = all_count - completed_count
 
         return render_template('assignments.html', 
@@ -534,17 +625,16 @@ def create_app():
     @login_required
     def speaking():
         # Get speaking submissions
-        submissions = Submission.query.filter_by(student_id=current_user.id, submission_type='SPEAKING').all()
+        submissions = Submission.query.options(defer(Submission.text_content), joinedload(Submission.grade)).filter_by(student_id=current_user.id, submission_type='SPEAKING').all()
         speaking_subs = [s for s in submissions if s.grade]
         
         # Calculate average score
-        avg_score = 0.0
-        if speaking_subs:
-            scores = []
-            for sub in speaking_subs:
-                if sub.grade.pronunciation_score and sub.grade.fluency_score:
-                    scores.append((sub.grade.pronunciation_score + sub.grade.fluency_score) / 2)
-            avg_score = round(sum(scores) / len(scores), 1) if scores else 0.0
+        total, count = 0.0, 0
+        for sub in speaking_subs:
+            if sub.grade.pronunciation_score and sub.grade.fluency_score:
+                total += (sub.grade.pronunciation_score + sub.grade.fluency_score) / 2
+                count += 1
+        avg_score = round(total / count, 1) if count else 0.0
         
         # Get last practice date
         last_practice = None
@@ -690,6 +780,24 @@ def create_app():
                              current=current_idx + 1, total=len(question_ids),
                              is_last=is_last, previous_answer=previous_answer)
 
+    @app.route('/quiz/check_batch', methods=['POST'])
+    @login_required
+    def quiz_check_batch():
+        # Instant feedback for several answers in one request: [{question_id, user_answer}, ...]
+        data = request.get_json(silent=True)
+        pairs = data.get('answers') if isinstance(data, dict) else data
+        if not isinstance(pairs, list):
+            return jsonify({'success': False, 'message': 'Expected a list of answers.'}), 400
+        if len(pairs) > _MAX_BATCH_ANSWERS:
+            return jsonify({'success': False, 'message': f'At most {_MAX_BATCH_ANSWERS} answers per request.'}), 400
+        try:
+            pairs = [{'question_id': int(p['question_id']), 'user_answer': str(p.get('user_answer') or '')} for p in pairs]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'Each answer needs a question_id.'}), 400
+        
+        results = QuizService.check_answers_batch(pairs)
+        return jsonify({'success': True, 'results': {str(q_id): correct for q_id, correct in results.items()}})
+
     @app.route('/quiz/finish', methods=['GET', 'POST'])
     @login_required
     def finish_quiz():
@@ -752,6 +860,7 @@ def create_app():
                 )
                 db.session.add(new_grade)
                 db.session.commit() # Commit submission and grade
+                invalidate_dashboard(current_user.id)
                 flash("Assignment marked as completed!", "success")
         
         QuizService.save_result(current_user.id, quiz_title, score, details=details)
@@ -910,7 +1019,7 @@ def create_app():
                     return redirect(url_for('settings'))
                 current_user.email = email
             if password:
-                current_user.password = generate_password_hash(password, method='pbkdf2:sha256')
+                current_user.password = PasswordService.hash_password(password)
             
             try:
                 db.session.commit()
@@ -934,12 +1043,8 @@ def create_app():
         if not file or file.filename == '':
             return jsonify({'success': False, 'message': 'No file provided.'}), 400
 
-        # Ensure profile pictures folder exists
-        profile_folder = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'static/profile_pics')
-        os.makedirs(profile_folder, exist_ok=True)
-
         filename = secure_filename(file.filename)
-        save_path = os.path.join(profile_folder, filename)
+        save_path = os.path.join(app.config['PROFILE_PICS_FOLDER'], filename)
         file.save(save_path)
 
         current_user.profile_image = filename
@@ -985,7 +1090,7 @@ def create_app():
         new_password = request.form.get('new_password')
         confirm_password = request.form.get('confirm_password')
 
-        if not check_password_hash(current_user.password, current_password):
+        if not PasswordService.verify_password(current_user.password, current_password):
             flash("Current password is incorrect.", "danger")
             return redirect(url_for('settings'))
 
@@ -993,7 +1098,7 @@ def create_app():
             flash("New passwords do not match.", "danger")
             return redirect(url_for('settings'))
 
-        current_user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+        current_user.password = PasswordService.hash_password(new_password)
         try:
             db.session.commit()
             flash("Password changed successfully.", "success")
@@ -1047,54 +1152,97 @@ def create_app():
 
     # ---  INSTRUCTOR DASHBOARD ---
 
-    @app.route('/instructor/dashboard')
-    @role_required('Instructor')
-    def instructor_dashboard():
+    def gradable_pending_filter():
+        """
+        Ungraded writing/handwritten submissions with text, i.e. what grade_pending can pick up
+        """
+        return (
+            ~Submission.grade.has(),
+            Submission.submission_type.in_(['WRITING', 'HANDWRITTEN']),
+            Submission.text_content.isnot(None)
+        )
+
+    def instructor_dashboard_watermark():
+        latest_submission = db.session.query(func.max(Submission.created_at)).scalar_subquery()
+        latest_grade = db.session.query(func.max(Grade.created_at)).scalar_subquery()
+        return tuple(db.session.query(latest_submission, latest_grade).one())
+
+    @cache.memoize(timeout=300)
+    def _compute_instructor_dashboard(watermark):
+        """
+        Compute the class-wide aggregates and sparkline series for the instructor dashboard.
+        """
         from datetime import timedelta
-        from collections import defaultdict
         
-        all_subs = Submission.query.all()
-        all_quizzes = Quiz.query.all()
-        graded_subs = [s for s in all_subs if s.grade]
-        class_avg = round(sum(s.grade.score for s in graded_subs) / len(graded_subs), 1) if graded_subs else 0.0
-        active_count = len(set(s.student_id for s in all_subs))
-        pending_count = len(all_subs) - len(graded_subs)
+        class_avg = db.session.query(func.avg(Grade.score)).join(Submission).scalar()
+        class_avg = round(class_avg, 1) if class_avg is not None else 0.0
+        active_count = db.session.query(func.count(func.distinct(Submission.student_id))).scalar()
+        pending_count = db.session.query(func.count(Submission.id)).filter(~Submission.grade.has()).scalar()
+        gradable_count = db.session.query(func.count(Submission.id)).filter(*gradable_pending_filter()).scalar()
         
         # Prepare sparkline data for last 7 days
         today = datetime.utcnow().date()
         last_7_days = [today - timedelta(days=i) for i in range(6, -1, -1)]  # Last 7 days including today
         
-        # Count submissions per day
-        submissions_by_date = defaultdict(int)
-        pending_by_date = defaultdict(int)
-        avg_score_by_date = defaultdict(list)
-        active_students_by_date = defaultdict(set)
-        
-        for sub in all_subs:
-            sub_date = sub.created_at.date()
-            if sub_date in last_7_days:
-                submissions_by_date[sub_date] += 1
-                if not sub.grade:
-                    pending_by_date[sub_date] += 1
-                if sub.grade:
-                    avg_score_by_date[sub_date].append(sub.grade.score)
-                active_students_by_date[sub_date].add(sub.student_id)
+        # One row per day: submissions, pending, average score and distinct active students
+        sub_day = func.date(Submission.created_at)
+        daily_rows = db.session.query(
+            sub_day,
+            func.count(Submission.id),
+            func.sum(case((Grade.id.is_(None), 1), else_=0)),
+            func.avg(Grade.score),
+            func.count(func.distinct(Submission.student_id))
+        ).outerjoin(Grade).filter(
+            Submission.created_at >= datetime.combine(last_7_days[0], datetime.min.time())
+        ).group_by(sub_day).all()
+        daily_stats = {to_date(day): (count, pending, avg, active) for day, count, pending, avg, active in daily_rows}
         
         # Create sparkline data arrays
+        empty_day = (0, 0, None, 0)
         sparkline_data = {
-            'submissions': [submissions_by_date.get(date, 0) for date in last_7_days],
-            'pending': [pending_by_date.get(date, 0) for date in last_7_days],
-            'class_avg': [round(sum(avg_score_by_date.get(date, [])) / len(avg_score_by_date.get(date, [])), 1) if avg_score_by_date.get(date, []) else 0.0 for date in last_7_days],
-            'active_students': [len(active_students_by_date.get(date, set())) for date in last_7_days]
+            'submissions': [daily_stats.get(date, empty_day)[0] for date in last_7_days],
+            'pending': [daily_stats.get(date, empty_day)[1] for date in last_7_days],
+            'class_avg': [round(daily_stats[date][2], 1) if daily_stats.get(date, empty_day)[2] is not None else 0.0 for date in last_7_days],
+            'active_students': [daily_stats.get(date, empty_day)[3] for date in last_7_days]
         }
 
+        return dict(
+            class_avg=class_avg,
+            active_count=active_count,
+            pending_count=pending_count,
+            gradable_count=gradable_count,
+            sparkline_data=sparkline_data
+        )
+
+    @app.route('/instructor/dashboard')
+    @role_required('Instructor')
+    def instructor_dashboard():
+        stats = _compute_instructor_dashboard(instructor_dashboard_watermark())
+        
+        all_subs = Submission.query.options(defer(Submission.text_content), joinedload(Submission.grade)).all()
+        all_quizzes = Quiz.query.all()
+
         return render_template('instructor_dashboard.html', 
                                submissions=all_subs, 
                                quizzes=all_quizzes,
-                               class_avg=class_avg, 
-                               active_count=active_count,
-                               pending_count=pending_count,
-                               sparkline_data=sparkline_data)
+                               **stats)
+
+    @app.route('/instructor/grade_pending', methods=['POST'])
+    @role_required('Instructor')
+    def instructor_grade_pending():
+        # Ungraded writing/handwritten submissions with text, graded in batches in the background
+        submission_ids = [sub_id for sub_id, in db.session.query(Submission.id).filter(
+            *gradable_pending_filter()
+        ).order_by(Submission.created_at.asc()).all()]
+        # Leave out uploads still being graded and ids an earlier click already queued
+        submission_ids = claim_for_grading(submission_ids)
+        
+        if not submission_ids:
+            flash("There are no pending submissions to grade.", "info")
+        else:
+            executor.submit(grade_pending_task, submission_ids)
+            flash(f"Grading {len(submission_ids)} pending submissions in the background.", "success")
+        return redirect(url_for('instructor_dashboard'))
 
     @app.route('/instructor/students')
     @role_required('Instructor')
@@ -1114,7 +1262,7 @@ def create_app():
         graded_subs = [s for s in submissions if s.grade]
         avg_score = round(sum(s.grade.score for s in graded_subs) / len(graded_subs), 1) if graded_subs else 0.0
         total_submissions = len(submissions)
-        pending_submissions = len([s for s in submissions if not s.grade])
+        pending_submissions = total_submissions - len(graded_subs)
 
         return render_template(
             'instructor_student_detail.html',
@@ -1246,6 +1394,65 @@ def create_app():
         questions = Question.query.all()
         return render_template('manage_questions.html', questions=questions)
 
+    # --- BACKGROUND GRADING ---
+    def grade_submission_task(submission_id, student_id, text_content):
+        """
+        Evaluate a submission with AI and store the grade (runs on the executor).
+        The caller claims submission_id with claim_for_grading before queueing.
+        """
+        with app.app_context():
+            try:
+                print(f"Starting AI analysis for submission {submission_id}")
+                ai_res = AIService.evaluate_writing(text_content)
+                if ai_res and ai_res.get('score') is not None:
+                    if GradingService.process_evaluation(submission_id, ai_res):
+                        invalidate_dashboard(student_id)
+                    else:
+                        print(f"Failed to save grade for submission {submission_id}")
+                else:
+                    error_msg = ai_res.get('general_feedback', 'Unknown error') if ai_res else 'No response from AI'
+                    print(f"Analysis failed for submission {submission_id}: {error_msg}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Background grading error for submission {submission_id}: {e}")
+            finally:
+                release_grading([submission_id])
+
+    def queue_grading(submission_id, student_id, text_content):
+        """
+        Claim a new submission and grade it in the background
+        """
+        if claim_for_grading([submission_id]):
+            executor.submit(grade_submission_task, submission_id, student_id, text_content)
+
+    def grade_pending_task(submission_ids):
+        """
+        Grade ungraded writing submissions in batches of AIService.BATCH_SIZE (runs on the executor).
+        The ids must already be claimed with claim_for_grading; each chunk is released once processed.
+        """
+        with app.app_context():
+            for start in range(0, len(submission_ids), AIService.BATCH_SIZE):
+                chunk = submission_ids[start:start + AIService.BATCH_SIZE]
+                try:
+                    # Skip anything graded since the button was pressed (e.g. an instructor adjustment)
+                    rows = db.session.query(Submission.id, Submission.student_id, Submission.text_content).filter(
+                        Submission.id.in_(chunk),
+                        ~Submission.grade.has()
+                    ).all()
+                    if not rows:
+                        continue
+                    results = AIService.evaluate_writing_batch([text for _, _, text in rows])
+                    for (submission_id, student_id, _), ai_res in zip(rows, results):
+                        if ai_res is None:
+                            print(f"Batch analysis failed for submission {submission_id}")
+                        elif GradingService.process_evaluation(submission_id, ai_res):
+                            invalidate_dashboard(student_id)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Batch grading error for submissions {chunk}: {e}")
+                finally:
+                    release_grading(chunk)
+
     # --- SUBMISSION ROUTES ---
 
     @app.route('/submit/writing', methods=['GET', 'POST'])
@@ -1265,18 +1472,22 @@ def create_app():
                 
                 filename = secure_filename(file.filename)
                 file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
                 
+                # Parse straight from the upload stream instead of re-reading the saved file
+                file.stream.seek(0)
                 if filename.endswith('.docx'):
-                    doc = docx.Document(file_path)
+                    doc = docx.Document(file.stream)
                     text_content = "\n".join([p.text for p in doc.paragraphs])
                 else:
+                    raw = file.stream.read()
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as f: 
-                            text_content = f.read()
-                    except:
-                        with open(file_path, 'r', encoding='latin-1') as f: 
-                            text_content = f.read()
+                        text_content = raw.decode('utf-8')
+                    except UnicodeDecodeError:
+                        text_content = raw.decode('latin-1')
+                    text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
+                
+                file.stream.seek(0)
+                file.save(file_path)
             
             # Check if we have text content
             if not text_content:
@@ -1292,21 +1503,11 @@ def create_app():
                 file_path=file.filename if file else None
             )
 
-            # Analyze with AI
-            print(f"Starting AI analysis for submission {new_sub.id}")
-            ai_res = AIService.evaluate_writing(text_content)
+            invalidate_dashboard(current_user.id)
             
-            # Process evaluation using GradingService
-            if ai_res and ai_res.get('score') is not None:
-                success = GradingService.process_evaluation(new_sub.id, ai_res)
-                if success:
-                    NotificationService.notify_grade_ready(current_user.id, new_sub.id)
-                    flash("Submission analyzed successfully!", "success")
-                else:
-                    flash("Failed to save grade.", "danger")
-            else:
-                error_msg = ai_res.get('general_feedback', 'Unknown error') if ai_res else 'No response from AI'
-                flash(f"Analysis failed: {error_msg}", "danger")
+            # Analyze with AI in the background; the dashboard shows the grade once it is saved
+            queue_grading(new_sub.id, current_user.id, text_content)
+            flash("Submission received! Your writing is being analyzed.", "success")
             
             return redirect(url_for('dashboard'))
         return render_template('submit_writing.html')
@@ -1317,15 +1518,21 @@ def create_app():
         activity_id = request.args.get('activity_id')
         image_path = None
         extracted_text = None
+        submission_id = None
         
         if request.method == 'POST':
             file = request.files.get('file')
             if file and file.filename != '':
                 filename = secure_filename(file.filename)
                 file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
                 
-                extracted_text = OCRService.extract_text_from_image(file_path)
+                # OCR straight from the upload bytes; the disk write happens alongside in the background
+                raw = file.read()
+                saving = file_executor.submit(persist_upload, file_path, raw)
+                
+                extracted_text = OCRService.extract_text_from_bytes(raw)
+                # Only reference the file once it is actually on disk
+                saved = saving.result()
                 if not extracted_text:
                     flash("Failed to extract text from image. Please upload a clearer image with better handwriting.", "danger")
                     return render_template('submit_handwritten.html', 
@@ -1339,23 +1546,40 @@ def create_app():
                         activity_id=activity_id,
                         submission_type='HANDWRITTEN',
                         text_content=extracted_text,
-                        file_path=filename
+                        file_path=filename if saved else None
                     )
+                    invalidate_dashboard(current_user.id)
                     
-                    ai_res = AIService.evaluate_writing(extracted_text)
-                    if ai_res:
-                        # Process evaluation using GradingService
-                        success = GradingService.process_evaluation(new_sub.id, ai_res)
-                        if success:
-                            NotificationService.notify_grade_ready(current_user.id, new_sub.id)
+                    # Grade in the background; the page polls grade_status instead of a flash notification
+                    queue_grading(new_sub.id, current_user.id, extracted_text)
+                    submission_id = new_sub.id
                     
                     # Set image path for display (relative to static folder)
-                    image_path = f"uploads/{filename}"
-                    flash("Image processed successfully!", "success")
+                    if saved:
+                        image_path = f"uploads/{filename}"
+                    flash("Image processed successfully! Your writing is being analyzed.", "success")
                     
         return render_template('submit_handwritten.html', 
                                image_path=image_path,
-                               extracted_text=extracted_text)
+                               extracted_text=extracted_text,
+                               submission_id=submission_id)
+
+    @app.route('/submission/<int:submission_id>/grade_status')
+    @login_required
+    def grade_status(submission_id):
+        student_id = db.session.query(Submission.student_id).filter_by(id=submission_id).scalar()
+        if student_id is None:
+            return jsonify({'success': False, 'message': 'Submission not found'}), 404
+        if current_user.role != 'Instructor' and student_id != current_user.id:
+            return jsonify({'success': False, 'message': 'Permission denied'}), 403
+        
+        grade = Grade.query.filter_by(submission_id=submission_id).first()
+        if not grade:
+            # Not pending either means the background task failed or was lost (e.g. on restart)
+            with _grading_lock:
+                pending = submission_id in _grading_in_flight
+            return jsonify({'ready': False, 'pending': pending})
+        return jsonify({'ready': True, 'score': grade.score, 'feedback': grade.general_feedback})
 
     @app.route('/history')
     @login_required
@@ -1367,15 +1591,23 @@ def create_app():
             quizzes = QuizRepository.get_quizzes(user_id=current_user.id)
             submissions = []
         else:
-            query = Submission.query.filter_by(student_id=current_user.id)
+            # One LEFT JOIN projecting only the columns the tiles show, as plain rows
+            query = db.session.query(
+                Submission.id,
+                Submission.submission_type,
+                Submission.created_at,
+                Submission.file_path,
+                Grade.id.label('grade_id'),
+                Grade.score
+            ).outerjoin(Grade, Grade.submission_id == Submission.id).filter(Submission.student_id == current_user.id)
             
             if filter_type:
                 if filter_type == 'speaking':
-                    query = query.filter_by(submission_type='SPEAKING')
+                    query = query.filter(Submission.submission_type == 'SPEAKING')
                 elif filter_type == 'writing':
-                    query = query.filter_by(submission_type='WRITING')
+                    query = query.filter(Submission.submission_type == 'WRITING')
                 elif filter_type == 'handwritten':
-                    query = query.filter_by(submission_type='HANDWRITTEN')
+                    query = query.filter(Submission.submission_type == 'HANDWRITTEN')
             
             submissions = query.order_by(Submission.created_at.desc()).all()
 
@@ -1390,9 +1622,8 @@ def create_app():
     @app.route('/feedback/<int:submission_id>')
     @login_required
     def view_feedback(submission_id):
-        # Use FeedbackRepository to find feedback
-        grade = FeedbackRepository.find_feedback_by_submission_id(submission_id)
-        sub = Submission.query.get_or_404(submission_id)
+        # Load the submission and its grade in one LEFT OUTER JOIN
+        sub = Submission.query.options(joinedload(Submission.grade)).filter_by(id=submission_id).first_or_404()
         
         # Ensure user can only view their own submissions (unless instructor)
         if current_user.role != 'Instructor' and sub.student_id != current_user.id:
@@ -1403,7 +1634,7 @@ def create_app():
     @app.route('/adjust_grade/<int:submission_id>', methods=['GET', 'POST'])
     @role_required('Instructor')
     def adjust_grade(submission_id):
-        submission = Submission.query.get_or_404(submission_id)
+        submission = Submission.query.options(joinedload(Submission.grade)).filter_by(id=submission_id).first_or_404()
         
         if not submission.grade:
             flash("No grade found for this submission.", "danger")
@@ -1417,6 +1648,7 @@ def create_app():
                 # Use GradingService to update grade
                 success = GradingService.update_student_grade(submission.id, new_score, new_feedback)
                 if success:
+                    invalidate_dashboard(submission.student_id)
                     NotificationService.notify_grade_ready(submission.student_id, submission.id)
                     flash("Grade adjusted successfully!", "success")
                     return redirect(url_for('instructor_dashboard'))
@@ -1431,19 +1663,19 @@ def create_app():
     @login_required
     def delete_submission(submission_id):
         from flask import jsonify
-        sub = Submission.query.get_or_404(submission_id)
+        student_id = db.session.query(Submission.student_id).filter_by(id=submission_id).scalar()
+        if student_id is None:
+            return jsonify({'success': False, 'error': 'Submission not found'}), 404
         # Ensure user can only delete their own submissions
-        if sub.student_id != current_user.id:
+        if student_id != current_user.id:
             return jsonify({'success': False, 'error': 'Permission denied'}), 403
         
         try:
-            # Delete associated grade if exists
-            if sub.grade:
-                db.session.delete(sub.grade)
-            
-            # Delete submission
-            db.session.delete(sub)
+            # Bulk DELETEs skip loading the rows; the grade goes first since there is no DB-level cascade
+            db.session.execute(delete(Grade).where(Grade.submission_id == submission_id))
+            db.session.execute(delete(Submission).where(Submission.id == submission_id))
             db.session.commit()
+            invalidate_dashboard(current_user.id)
             
             return jsonify({'success': True})
         except Exception as e:
@@ -1462,4 +1694,6 @@ def create_app():
 
 if __name__ == '__main__':
     app = create_app()
+    with app.app_context():
+        init_db()
     app.run(debug=True)
\ No newline at end of file
@@ -13,4 +13,21 @@ class Config:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(BASE_DIR, 'site.db')
     
     # Disable modification tracking to save memory
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Connection pool: check connections before use and recycle long-lived ones
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_size': 20,
+        'max_overflow': 10,
+        'pool_recycle': 1800
+    }
+    
+    # Dashboard cache: SimpleCache for development, e.g. CACHE_TYPE=RedisCache with CACHE_REDIS_URL in production
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'SimpleCache'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_DEFAULT_TIMEOUT = 300
+    
+    # Query observability: warn when a request exceeds this many queries, or a single query this many ms
+    QUERY_COUNT_WARN = int(os.environ.get('QUERY_COUNT_WARN') or 20)
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS') or 50)
\ No newline at end of file
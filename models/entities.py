@@ -45,6 +45,9 @@ class LearningActivity(db.Model):
     due_date = db.Column(db.DateTime, nullable=True) 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     instructor = db.relationship('User', backref=db.backref('created_activities', lazy=True))
+    __table_args__ = (
+        db.Index('ix_activity_due', 'due_date'),
+    )
 
 # --- 3. Submission Entity ---
 class Submission(db.Model):
@@ -57,6 +60,10 @@ class Submission(db.Model):
     text_content = db.Column(db.Text, nullable=True) 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     grade = db.relationship('Grade', backref='submission', uselist=False, cascade="all, delete-orphan")
+    __table_args__ = (
+        db.Index('ix_submission_student_created', 'student_id', 'created_at'),
+        db.Index('ix_submission_student_type_created', 'student_id', 'submission_type', 'created_at'),
+    )
 
 # --- 4. Grade Entity (Speaking Metrics Added) ---
 class Grade(db.Model):
@@ -90,6 +97,9 @@ class Quiz(db.Model):
     quiz_title = db.Column(db.String(100), nullable=False)
     score = db.Column(db.Float, nullable=False)
     date_taken = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_quiz_user_date', 'user_id', 'date_taken'),
+    )
 
 <<<<<<< HEAD
 # --- 7. Question Entity ---
@@ -116,4 +126,21 @@ class Question(db.Model):
     option_d = db.Column(db.String(200), nullable=True)
     correct_answer = db.Column(db.String(1), nullable=False)  # 'A', 'B', 'C', or 'D'
     category = db.Column(db.String(50), nullable=True)  # 'grammar', 'vocabulary', etc.
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# --- 9. UserStats Entity (precomputed dashboard aggregates) ---
+class UserStats(db.Model):
+    __tablename__ = 'user_stats'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    speaking_sum = db.Column(db.Float, default=0.0)
+    speaking_count = db.Column(db.Integer, default=0)
+    speaking_graded = db.Column(db.Integer, default=0)  # graded speaking submissions, with or without metrics
+    writing_sum = db.Column(db.Float, default=0.0)
+    writing_count = db.Column(db.Integer, default=0)
+    handwritten_sum = db.Column(db.Float, default=0.0)
+    handwritten_count = db.Column(db.Integer, default=0)
+    graded_sum = db.Column(db.Float, default=0.0)  # all graded submissions, including quizzes
+    graded_count = db.Column(db.Integer, default=0)
+    last_submission_date = db.Column(db.Date, nullable=True)
+    current_streak = db.Column(db.Integer, default=0)  # consecutive days ending on last_submission_date
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
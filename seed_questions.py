@@ -1,4 +1,4 @@
-from app import create_app
+from app import create_app, init_db
 from models.database import db
 from models.entities import Question
 
@@ -7,6 +7,7 @@ def seed_questions():
     app = create_app()
 
     with app.app_context():
+        init_db()
         if Question.query.count() > 0:
             print("Questions already exist, skipping seeding.")
             return
@@ -1,7 +1,11 @@
 import google.generativeai as genai
+import hashlib
 import json
 import os
+import threading
+from cachetools import LRUCache
 from dotenv import load_dotenv
+from pydantic import BaseModel
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,33 +20,92 @@ else:
     genai.configure(api_key=API_KEY)
     print(f"Gemini API configured successfully. API Key length: {len(API_KEY)}")
 
+# Fixed grading rubric, sent once as the model's system instruction so each call only carries the student's text
+WRITING_SYSTEM_PROMPT = """
+You are an experienced English teacher. Analyze the student writing submission you are given.
+
+Please provide the output strictly in valid JSON format with the following keys:
+- score: An integer between 0 and 100 representing the quality.
+- grammar_errors: A list of strings, each describing a specific grammar mistake found.
+- vocabulary_suggestions: A list of strings suggesting better vocabulary usage.
+- general_feedback: A supportive short paragraph summarizing the student's performance.
+"""
+
+# Several submissions graded in one request, each preceded by a ---ID:n--- delimiter line
+BATCH_SYSTEM_PROMPT = """
+You are an experienced English teacher. You will receive several student writing submissions.
+Each submission starts with a delimiter line of the form ---ID:n---.
+
+Please provide the output strictly in valid JSON format: an array with one object per submission, with the following keys:
+- id: The number n from the submission's delimiter line.
+- score: An integer between 0 and 100 representing the quality.
+- grammar_errors: A list of strings, each describing a specific grammar mistake found.
+- vocabulary_suggestions: A list of strings suggesting better vocabulary usage.
+- general_feedback: A supportive short paragraph summarizing the student's performance.
+"""
+
+# Structured output: Gemini constrains its response to these schemas, so it is always parseable JSON
+class EvalResult(BaseModel):
+    score: int
+    grammar_errors: list[str]
+    vocabulary_suggestions: list[str]
+    general_feedback: str
+
+class BatchEvalResult(EvalResult):
+    id: int
+
+WRITING_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": EvalResult}
+BATCH_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": list[BatchEvalResult]}
+
+# Model handles (one per system instruction) are resolved once per process and shared by request and background threads.
+# The SDK's gRPC client keeps one channel open, so the connection is reused across calls too.
+_models = {}
+_model_name = None
+_model_lock = threading.Lock()
+
+# Evaluations of identical texts (retries, resubmissions) are served from memory instead of another Gemini call
+_result_cache = LRUCache(maxsize=1024)
+_result_cache_lock = threading.Lock()
+
+def _text_key(text_content):
+    return hashlib.blake2b(text_content.encode('utf-8'), digest_size=16).hexdigest()
+
 class AIService:
+    # Submissions per batch request; larger batches get slower and less reliable
+    BATCH_SIZE = 5
+    
     @staticmethod
-    def evaluate_writing(text_content):
+    def _get_model(system_instruction=WRITING_SYSTEM_PROMPT):
         """
-        Analyzes student writing using the Gemini AI model.
-        Returns a JSON object containing score, errors, and feedback.
+        Return the shared Gemini model for a system instruction, resolving an available model name on first use.
+        Returns None if no model could be initialized.
         """
-        if not API_KEY:
-            print("ERROR: Cannot evaluate writing - GEMINI_API_KEY is not set!")
-            return {
-                "score": 0,
-                "grammar_errors": ["API key not configured. Please check your .env file."],
-                "vocabulary_suggestions": [],
-                "general_feedback": "Could not process AI request - API key missing."
-            }
+        model = _models.get(system_instruction)
+        if model is not None:
+            return model
         
-        if not text_content or len(text_content.strip()) == 0:
-            print("ERROR: Empty text content provided for analysis")
-            return {
-                "score": 0,
-                "grammar_errors": ["No text content provided for analysis."],
-                "vocabulary_suggestions": [],
-                "general_feedback": "Please provide some text to analyze."
-            }
+        with _model_lock:
+            model = _models.get(system_instruction)
+            if model is None:
+                model, discovered = AIService._init_model(system_instruction)
+                # Only keep handles for a model the API actually listed; a guessed fallback is retried next call
+                if model is not None and discovered:
+                    _models[system_instruction] = model
+        return model
+    
+    @staticmethod
+    def _init_model(system_instruction):
+        """
+        List available models and initialize the first preferred one that supports generateContent.
+        Returns (model, discovered); discovered is False when the model name is a fallback guess.
+        """
+        global _model_name
+        # The model list is fetched once; handles for other system instructions reuse the chosen name
+        if _model_name is not None:
+            return genai.GenerativeModel(_model_name, system_instruction=system_instruction), True
         
-        # List available models and use the first one that supports generateContent
         model = None
+        discovered = False
         try:
             print("Fetching available models from API...")
             available_models = genai.list_models()
@@ -55,13 +118,14 @@ class AIService:
                     supported_models.append(model_name)
                     print(f"Found supported model: {model_name}")
             
+            discovered = bool(supported_models)
             if not supported_models:
                 print("No models with generateContent support found. Trying common model names...")
-                # Fallback to common names
-                supported_models = ['gemini-pro', 'gemini-1.5-pro', 'gemini-1.5-flash']
+                # Fallback to common names (gemini-pro is left out: it rejects system instructions)
+                supported_models = ['gemini-1.5-flash', 'gemini-1.5-pro']
             
             # Try to use preferred models first
-            preferred = ['gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
+            preferred = ['gemini-1.5-flash', 'gemini-1.5-pro']
             model_name = None
             
             for pref in preferred:
@@ -74,7 +138,9 @@ class AIService:
             
             if model_name:
                 print(f"Attempting to use model: {model_name}")
-                model = genai.GenerativeModel(model_name)
+                model = genai.GenerativeModel(model_name, system_instruction=system_instruction)
+                if discovered:
+                    _model_name = model_name
                 print(f"Successfully initialized model: {model_name}")
             else:
                 raise Exception("No available models found")
@@ -83,15 +149,49 @@ class AIService:
             print(f"Error fetching models: {e}")
             print("Trying direct model initialization with common names...")
             # Fallback: try common model names directly
-            fallback_names = ['gemini-pro', 'gemini-1.5-pro', 'gemini-1.5-flash']
+            fallback_names = ['gemini-1.5-flash', 'gemini-1.5-pro']
             for model_name in fallback_names:
                 try:
-                    model = genai.GenerativeModel(model_name)
+                    model = genai.GenerativeModel(model_name, system_instruction=system_instruction)
                     print(f"Successfully initialized model: {model_name}")
                     break
                 except Exception as e2:
                     print(f"Failed {model_name}: {str(e2)}")
                     continue
+        return model, discovered
+    
+    @staticmethod
+    def evaluate_writing(text_content):
+        """
+        Analyzes student writing using the Gemini AI model.
+        Returns a JSON object containing score, errors, and feedback.
+        """
+        if not API_KEY:
+            print("ERROR: Cannot evaluate writing - GEMINI_API_KEY is not set!")
+            return {
+                "score": 0,
+                "grammar_errors": ["API key not configured. Please check your .env file."],
+                "vocabulary_suggestions": [],
+                "general_feedback": "Could not process AI request - API key missing."
+            }
+        
+        if not text_content or len(text_content.strip()) == 0:
+            print("ERROR: Empty text content provided for analysis")
+            return {
+                "score": 0,
+                "grammar_errors": ["No text content provided for analysis."],
+                "vocabulary_suggestions": [],
+                "general_feedback": "Please provide some text to analyze."
+            }
+        
+        key = _text_key(text_content)
+        with _result_cache_lock:
+            cached = _result_cache.get(key)
+        if cached is not None:
+            print("Returning cached evaluation for identical text")
+            return dict(cached)
+        
+        model = AIService._get_model()
         
         if not model:
             return {
@@ -101,23 +201,9 @@ class AIService:
                 "general_feedback": "Could not process AI request - model initialization failed. Please check your API key."
             } 
         
-        prompt = f"""
-        You are an experienced English teacher. Analyze the following student writing submission:
-        
-        "{text_content}"
-        
-        Please provide the output strictly in valid JSON format with the following keys:
-        - score: An integer between 0 and 100 representing the quality.
-        - grammar_errors: A list of strings, each describing a specific grammar mistake found.
-        - vocabulary_suggestions: A list of strings suggesting better vocabulary usage.
-        - general_feedback: A supportive short paragraph summarizing the student's performance.
-        
-        Do not use markdown formatting (like ```json). Just return the raw JSON object.
-        """
-        
         try:
             print(f"Calling Gemini API with text length: {len(text_content)} characters")
-            response = model.generate_content(prompt)
+            response = model.generate_content(text_content, generation_config=WRITING_GENERATION_CONFIG)
             
             if not response or not response.text:
                 print("ERROR: Empty response from Gemini API")
@@ -128,12 +214,14 @@ class AIService:
                     "general_feedback": "Could not process AI request - empty response."
                 }
             
-            # Clean potential markdown formatting from the response
-            clean_text = response.text.strip().replace('```json', '').replace('```', '')
-            print(f"Received response from API, length: {len(clean_text)}")
+            print(f"Received response from API, length: {len(response.text)}")
             
-            result = json.loads(clean_text)
+            result = json.loads(response.text)
             print(f"Successfully parsed JSON response. Score: {result.get('score', 'N/A')}")
+            
+            # Only successful evaluations are cached; errors should be retried
+            with _result_cache_lock:
+                _result_cache[key] = dict(result)
             return result
             
         except json.JSONDecodeError as e:
@@ -154,4 +242,45 @@ class AIService:
                 "grammar_errors": [f"AI error: {str(e)}"],
                 "vocabulary_suggestions": [],
                 "general_feedback": f"Could not process AI request: {str(e)}"
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def evaluate_writing_batch(texts):
+        """
+        Analyzes up to BATCH_SIZE writing submissions in a single Gemini request.
+        Returns a list aligned with texts; an entry is None if that text could not be evaluated.
+        """
+        results = [None] * len(texts)
+        if not API_KEY:
+            print("ERROR: Cannot evaluate writing - GEMINI_API_KEY is not set!")
+            return results
+        
+        # Only send texts that have content; the ---ID:n--- number is the index into texts
+        indexed = [(i, t) for i, t in enumerate(texts) if t and t.strip()]
+        if not indexed:
+            return results
+        
+        model = AIService._get_model(BATCH_SYSTEM_PROMPT)
+        if not model:
+            print("ERROR: Could not initialize a Gemini model for batch evaluation")
+            return results
+        
+        prompt = "\n".join(f"---ID:{i}---\n{t}" for i, t in indexed)
+        try:
+            print(f"Calling Gemini API with a batch of {len(indexed)} submissions")
+            response = model.generate_content(prompt, generation_config=BATCH_GENERATION_CONFIG)
+            items = json.loads(response.text)
+            
+            for item in items:
+                try:
+                    i = int(item.get('id'))
+                except (TypeError, ValueError):
+                    continue
+                if 0 <= i < len(texts) and item.get('score') is not None:
+                    results[i] = item
+        except json.JSONDecodeError as e:
+            print(f"JSON Decode Error in batch evaluation: {e}")
+        except Exception as e:
+            print(f"AI Service Batch Execution Error: {type(e).__name__}: {e}")
+        
+        return results
\ No newline at end of file
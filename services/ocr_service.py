@@ -1,12 +1,45 @@
+import io
+import os
+import threading
+
+# Keep each Tesseract call single-threaded; concurrent requests already run OCR in parallel
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
 import pytesseract
 from PIL import Image
-import os
 from dotenv import load_dotenv
 load_dotenv()
 
-TESSERACT_PATH = os.getenv('TESSERACT_PATH', 'tesseract') 
+# Optional: tesserocr runs Tesseract in-process (no subprocess per call, releases the GIL while recognizing)
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+TESSERACT_PATH = os.getenv('TESSERACT_PATH', 'tesseract')
 pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
 
+# One tesserocr API per thread: an API object is not thread-safe, but separate ones can run concurrently
+_local = threading.local()
+
+def _get_tess_api():
+    """
+    Return this thread's tesserocr API, or None if tesserocr is unavailable or fails to load.
+    """
+    global tesserocr
+    if tesserocr is None:
+        return None
+    api = getattr(_local, 'api', None)
+    if api is None:
+        try:
+            api = tesserocr.PyTessBaseAPI(lang='eng')
+        except RuntimeError as e:
+            print(f"tesserocr could not load language data, falling back to pytesseract: {e}")
+            tesserocr = None
+            return None
+        _local.api = api
+    return api
+
 class OCRService:
     @staticmethod
     def extract_text_from_image(image_path):
@@ -20,16 +53,41 @@ class OCRService:
                 return None
 
             # Open image using Pillow
-            img = Image.open(image_path)
-            
-            # Convert image to string
-            # Using 'eng' for English language recognition
-            text = pytesseract.image_to_string(img, lang='eng')
-            
-            return text.strip()
+            return OCRService._recognize(Image.open(image_path))
         except Exception as e:
-            # Print detailed error to terminal for debugging
-            print(f"OCR System Error: {e}")
-            if "tesseract" in str(e).lower():
-                print("Note: Make sure Tesseract OCR is installed and TESSERACT_PATH is set correctly in .env file")
-            return None
\ No newline at end of file
+            OCRService._report_error(e)
+            return None
+
+    @staticmethod
+    def extract_text_from_bytes(image_bytes):
+        """
+        Extracts text from an uploaded image held in memory, without writing it to disk first.
+        """
+        try:
+            return OCRService._recognize(Image.open(io.BytesIO(image_bytes)))
+        except Exception as e:
+            OCRService._report_error(e)
+            return None
+
+    @staticmethod
+    def _recognize(img):
+        """
+        Run Tesseract on a Pillow image and return the stripped text.
+        """
+        # Convert image to string
+        # Using 'eng' for English language recognition
+        api = _get_tess_api()
+        if api is not None:
+            api.SetImage(img)
+            text = api.GetUTF8Text()
+        else:
+            text = pytesseract.image_to_string(img, lang='eng')
+
+        return text.strip()
+
+    @staticmethod
+    def _report_error(e):
+        # Print detailed error to terminal for debugging
+        print(f"OCR System Error: {e}")
+        if "tesseract" in str(e).lower():
+            print("Note: Make sure Tesseract OCR is installed and TESSERACT_PATH is set correctly in .env file")
\ No newline at end of file
@@ -0,0 +1,37 @@
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
+
+# Argon2id: 64 MiB memory, 2 passes, single lane
+_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
+class PasswordService:
+    @staticmethod
+    def hash_password(password):
+        """
+        Hash a password with Argon2id
+        """
+        return _hasher.hash(password)
+
+    @staticmethod
+    def verify_password(password_hash, password):
+        """
+        Check a password against an Argon2 hash or a legacy Werkzeug pbkdf2 hash
+        """
+        if not password_hash or password is None:
+            return False
+        if password_hash.startswith('$argon2'):
+            try:
+                return _hasher.verify(password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return check_password_hash(password_hash, password)
+
+    @staticmethod
+    def needs_rehash(password_hash):
+        """
+        True for legacy pbkdf2 hashes or Argon2 hashes made with outdated parameters
+        """
+        if not password_hash.startswith('$argon2'):
+            return True
+        return _hasher.check_needs_rehash(password_hash)
@@ -19,11 +19,28 @@ class QuizService:
         Check if user answer is correct
         Returns True if correct, False otherwise
         """
-        question = Question.query.get(question_id)
-        if not question:
+        correct_answer = db.session.query(Question.correct_answer).filter(Question.id == question_id).scalar()
+        if not correct_answer:
             return False
         
-        return user_answer.upper() == question.correct_answer.upper()
+        return user_answer.upper() == correct_answer.upper()
+    
+    @staticmethod
+    def check_answers_batch(pairs):
+        """
+        Check several answers with a single query
+        pairs: [{'question_id': ..., 'user_answer': ...}, ...]
+        Returns {question_id: True/False}
+        """
+        ids = list({p['question_id'] for p in pairs})
+        correct_answers = dict(db.session.query(Question.id, Question.correct_answer).filter(Question.id.in_(ids)).all())
+        
+        results = {}
+        for p in pairs:
+            correct_answer = correct_answers.get(p['question_id'])
+            user_answer = p.get('user_answer') or ''
+            results[p['question_id']] = correct_answer is not None and user_answer.upper() == correct_answer.upper()
+        return results
     
     @staticmethod
     def calculate_final_score(question_ids, user_answers):
@@ -34,11 +51,14 @@ class QuizService:
         correct = 0
         total = len(question_ids)
         
+        # Fetch every correct answer in one query instead of one per question
+        rows = db.session.query(Question.id, Question.correct_answer).filter(Question.id.in_(question_ids)).all()
+        correct_answers = {q_id: correct_answer.upper() for q_id, correct_answer in rows}
+        
         for q_id in question_ids:
-            if q_id in user_answers:
-                question = Question.query.get(q_id)
-                if question and user_answers[q_id].upper() == question.correct_answer.upper():
-                    correct += 1
+            user_answer = user_answers.get(str(q_id)) or user_answers.get(q_id)
+            if user_answer and user_answer.upper() == correct_answers.get(q_id):
+                correct += 1
         
         score = round((correct / total) * 100, 1) if total > 0 else 0
         return (correct, total, score)
@@ -83,11 +103,28 @@ class QuizService:
         Check if user answer is correct
         Returns True if correct, False otherwise
         """
-        question = Question.query.get(question_id)
-        if not question:
+        correct_answer = db.session.query(Question.correct_answer).filter(Question.id == question_id).scalar()
+        if not correct_answer:
             return False
         
-        return user_answer.upper() == question.correct_answer.upper()
+        return user_answer.upper() == correct_answer.upper()
+    
+    @staticmethod
+    def check_answers_batch(pairs):
+        """
+        Check several answers with a single query
+        pairs: [{'question_id': ..., 'user_answer': ...}, ...]
+        Returns {question_id: True/False}
+        """
+        ids = list({p['question_id'] for p in pairs})
+        correct_answers = dict(db.session.query(Question.id, Question.correct_answer).filter(Question.id.in_(ids)).all())
+        
+        results = {}
+        for p in pairs:
+            correct_answer = correct_answers.get(p['question_id'])
+            user_answer = p.get('user_answer') or ''
+            results[p['question_id']] = correct_answer is not None and user_answer.upper() == correct_answer.upper()
+        return results
     
     @staticmethod
     def calculate_final_score(question_ids, user_answers):
@@ -98,12 +135,14 @@ class QuizService:
         correct = 0
         total = len(question_ids)
         
+        # Fetch every correct answer in one query instead of one per question
+        rows = db.session.query(Question.id, Question.correct_answer).filter(Question.id.in_(question_ids)).all()
+        correct_answers = {q_id: correct_answer.upper() for q_id, correct_answer in rows}
+        
         for q_id in question_ids:
-            key = str(q_id)
-            if key in user_answers:
-                question = Question.query.get(q_id)
-                if question and user_answers[key].upper() == question.correct_answer.upper():
-                    correct += 1
+            user_answer = user_answers.get(str(q_id)) or user_answers.get(q_id)
+            if user_answer and user_answer.upper() == correct_answers.get(q_id):
+                correct += 1
         
         score = round((correct / total) * 100, 1) if total > 0 else 0
         return (correct, total, score)
@@ -121,17 +160,18 @@ class QuizService:
         db.session.add(new_quiz)
         db.session.flush()  # get new_quiz.id without full commit
 
-        # Optionally save per-question details
+        # Optionally save per-question details as one multi-row Core INSERT
         if details:
-            for item in details:
-                detail = QuizDetail(
-                    quiz_id=new_quiz.id,
-                    question_text=item.get('question_text', ''),
-                    user_answer=item.get('user_answer'),
-                    correct_answer=item.get('correct_answer'),
-                    is_correct=item.get('is_correct', False)
-                )
-                db.session.add(detail)
+            db.session.execute(QuizDetail.__table__.insert(), [
+                {
+                    'quiz_id': new_quiz.id,
+                    'question_text': item.get('question_text', ''),
+                    'user_answer': item.get('user_answer'),
+                    'correct_answer': item.get('correct_answer'),
+                    'is_correct': bool(item.get('is_correct', False))
+                }
+                for item in details
+            ])
 
         db.session.commit()
         return new_quiz
@@ -1,8 +1,15 @@
 <<<<<<< HEAD
-from models.entities import Submission, Grade, Quiz
+from models.entities import Submission, Grade, Quiz, UserStats
 from models.database import db
 from datetime import datetime, timedelta
 from collections import defaultdict
+from sqlalchemy import func, case, and_
+
+def to_date(value):
+    # func.date() returns a 'YYYY-MM-DD' string on SQLite and a date elsewhere
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    return value
 
 class StatsService:
     @staticmethod
@@ -11,38 +18,25 @@ class StatsService:
         Get dashboard data for a student
         Returns dictionary with scores, progress, etc.
         """
-        submissions = Submission.query.filter_by(student_id=student_id).all()
-        
-        # Calculate scores
-        speaking_subs = [s for s in submissions if s.submission_type == 'SPEAKING' and s.grade]
-        writing_subs = [s for s in submissions if s.submission_type == 'WRITING' and s.grade]
-        handwritten_subs = [s for s in submissions if s.submission_type == 'HANDWRITTEN' and s.grade]
-        
-        speaking_score = 0.0
-        if speaking_subs:
-            scores = []
-            for sub in speaking_subs:
-                if sub.grade.pronunciation_score and sub.grade.fluency_score:
-                    scores.append((sub.grade.pronunciation_score + sub.grade.fluency_score) / 2)
-            speaking_score = round(sum(scores) / len(scores), 1) if scores else 0.0
-        
-        writing_score = round(sum(s.grade.score for s in writing_subs) / len(writing_subs), 1) if writing_subs else 0.0
-        handwritten_score = round(sum(s.grade.score for s in handwritten_subs) / len(handwritten_subs), 1) if handwritten_subs else 0.0
+        # Per-type averages come from the stored stats row, so the cost does not grow with history
+        stats = StatsService.get_user_stats(student_id)
+        speaking_score = round(stats.speaking_sum / stats.speaking_count, 1) if stats.speaking_count else 0.0
+        writing_score = round(stats.writing_sum / stats.writing_count, 1) if stats.writing_count else 0.0
+        handwritten_score = round(stats.handwritten_sum / stats.handwritten_count, 1) if stats.handwritten_count else 0.0
         
-        # Get quiz data
-        quizzes = Quiz.query.filter_by(user_id=student_id).all()
-        quiz_score = 0.0
-        if quizzes:
-            quiz_scores_list = [q.score for q in quizzes if q.score is not None]
-            quiz_score = round(sum(quiz_scores_list) / len(quiz_scores_list), 1) if quiz_scores_list else 0.0
+        total_submissions = db.session.query(func.count(Submission.id)).filter(Submission.student_id == student_id).scalar_subquery()
+        completed_quizzes = db.session.query(func.count(Quiz.id)).filter(Quiz.user_id == student_id).scalar_subquery()
+        quiz_avg = db.session.query(func.avg(Quiz.score)).filter(Quiz.user_id == student_id).scalar_subquery()
+        total_submissions, completed_quizzes, quiz_avg = db.session.query(total_submissions, completed_quizzes, quiz_avg).one()
+        quiz_score = round(quiz_avg, 1) if quiz_avg is not None else 0.0
         
         return {
             'speaking_score': speaking_score,
             'writing_score': writing_score,
             'handwritten_score': handwritten_score,
             'quiz_score': quiz_score,
-            'total_submissions': len(submissions),
-            'completed_quizzes': len(quizzes)
+            'total_submissions': total_submissions,
+            'completed_quizzes': completed_quizzes
         }
     
     @staticmethod
@@ -56,6 +50,71 @@ class StatsService:
         else:
             return Grade.query.all()
     
+    @staticmethod
+    def refresh_user_stats(student_id):
+        """
+        Recompute the stored dashboard aggregates for a student
+        Called after submissions or grades change so the dashboard reads a single row
+        """
+        speaking_composite = case(
+            (and_(Grade.pronunciation_score != 0, Grade.fluency_score != 0),
+             (Grade.pronunciation_score + Grade.fluency_score) / 2)
+        )
+        type_rows = db.session.query(
+            Submission.submission_type,
+            func.count(Grade.id),
+            func.sum(Grade.score),
+            func.count(speaking_composite),
+            func.sum(speaking_composite)
+        ).join(Grade).filter(
+            Submission.student_id == student_id
+        ).group_by(Submission.submission_type).all()
+        
+        stats = db.session.get(UserStats, student_id) or UserStats(user_id=student_id)
+        stats.speaking_sum, stats.speaking_count, stats.speaking_graded = 0.0, 0, 0
+        stats.writing_sum, stats.writing_count = 0.0, 0
+        stats.handwritten_sum, stats.handwritten_count = 0.0, 0
+        stats.graded_sum, stats.graded_count = 0.0, 0
+        
+        for sub_type, graded, score_sum, composite_count, composite_sum in type_rows:
+            stats.graded_sum += score_sum or 0.0
+            stats.graded_count += graded
+            if sub_type == 'SPEAKING':
+                stats.speaking_graded = graded
+                stats.speaking_count = composite_count
+                stats.speaking_sum = composite_sum or 0.0
+            elif sub_type == 'WRITING':
+                stats.writing_count = graded
+                stats.writing_sum = score_sum or 0.0
+            elif sub_type == 'HANDWRITTEN':
+                stats.handwritten_count = graded
+                stats.handwritten_sum = score_sum or 0.0
+        
+        # Streak of consecutive submission days ending on the latest one
+        submission_day = func.date(Submission.created_at)
+        days = [to_date(day) for (day,) in db.session.query(submission_day).filter(
+            Submission.student_id == student_id
+        ).distinct().order_by(submission_day.desc()).all()]
+        stats.last_submission_date = days[0] if days else None
+        stats.current_streak = 0
+        check_date = stats.last_submission_date
+        for day in days:
+            if day != check_date:
+                break
+            stats.current_streak += 1
+            check_date -= timedelta(days=1)
+        
+        db.session.add(stats)
+        db.session.commit()
+        return stats
+    
+    @staticmethod
+    def get_user_stats(student_id):
+        """
+        Get stored dashboard aggregates, building them on first access
+        """
+        return db.session.get(UserStats, student_id) or StatsService.refresh_user_stats(student_id)
+    
     @staticmethod
     def fetch_recommendations(student_id):
         """
@@ -93,10 +152,17 @@ class StatsService:
 
 
 =======
-from models.entities import Submission, Grade, Quiz
+from models.entities import Submission, Grade, Quiz, UserStats
 from models.database import db
 from datetime import datetime, timedelta
 from collections import defaultdict
+from sqlalchemy import func, case, and_
+
+def to_date(value):
+    # func.date() returns a 'YYYY-MM-DD' string on SQLite and a date elsewhere
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    return value
 
 class StatsService:
     @staticmethod
@@ -105,38 +171,25 @@ class StatsService:
         Get dashboard data for a student
         Returns dictionary with scores, progress, etc.
         """
-        submissions = Submission.query.filter_by(student_id=student_id).all()
-        
-        # Calculate scores
-        speaking_subs = [s for s in submissions if s.submission_type == 'SPEAKING' and s.grade]
-        writing_subs = [s for s in submissions if s.submission_type == 'WRITING' and s.grade]
-        handwritten_subs = [s for s in submissions if s.submission_type == 'HANDWRITTEN' and s.grade]
-        
-        speaking_score = 0.0
-        if speaking_subs:
-            scores = []
-            for sub in speaking_subs:
-                if sub.grade.pronunciation_score and sub.grade.fluency_score:
-                    scores.append((sub.grade.pronunciation_score + sub.grade.fluency_score) / 2)
-            speaking_score = round(sum(scores) / len(scores), 1) if scores else 0.0
-        
-        writing_score = round(sum(s.grade.score for s in writing_subs) / len(writing_subs), 1) if writing_subs else 0.0
-        handwritten_score = round(sum(s.grade.score for s in handwritten_subs) / len(handwritten_subs), 1) if handwritten_subs else 0.0
+        # Per-type averages come from the stored stats row, so the cost does not grow with history
+        stats = StatsService.get_user_stats(student_id)
+        speaking_score = round(stats.speaking_sum / stats.speaking_count, 1) if stats.speaking_count else 0.0
+        writing_score = round(stats.writing_sum / stats.writing_count, 1) if stats.writing_count else 0.0
+        handwritten_score = round(stats.handwritten_sum / stats.handwritten_count, 1) if stats.handwritten_count else 0.0
         
-        # Get quiz data
-        quizzes = Quiz.query.filter_by(user_id=student_id).all()
-        quiz_score = 0.0
-        if quizzes:
-            quiz_scores_list = [q.score for q in quizzes if q.score is not None]
-            quiz_score = round(sum(quiz_scores_list) / len(quiz_scores_list), 1) if quiz_scores_list else 0.0
+        total_submissions = db.session.query(func.count(Submission.id)).filter(Submission.student_id == student_id).scalar_subquery()
+        completed_quizzes = db.session.query(func.count(Quiz.id)).filter(Quiz.user_id == student_id).scalar_subquery()
+        quiz_avg = db.session.query(func.avg(Quiz.score)).filter(Quiz.user_id == student_id).scalar_subquery()
+        total_submissions, completed_quizzes, quiz_avg = db.session.query(total_submissions, completed_quizzes, quiz_avg).one()
+        quiz_score = round(quiz_avg, 1) if quiz_avg is not None else 0.0
         
         return {
             'speaking_score': speaking_score,
             'writing_score': writing_score,
             'handwritten_score': handwritten_score,
             'quiz_score': quiz_score,
-            'total_submissions': len(submissions),
-            'completed_quizzes': len(quizzes)
+            'total_submissions': total_submissions,
+            'completed_quizzes': completed_quizzes
         }
     
     @staticmethod
@@ -150,6 +203,71 @@ class StatsService:
         else:
             return Grade.query.all()
     
+    @staticmethod
+    def refresh_user_stats(student_id):
+        """
+        Recompute the stored dashboard aggregates for a student
+        Called after submissions or grades change so the dashboard reads a single row
+        """
+        speaking_composite = case(
+            (and_(Grade.pronunciation_score != 0, Grade.fluency_score != 0),
+             (Grade.pronunciation_score + Grade.fluency_score) / 2)
+        )
+        type_rows = db.session.query(
+            Submission.submission_type,
+            func.count(Grade.id),
+            func.sum(Grade.score),
+            func.count(speaking_composite),
+            func.sum(speaking_composite)
+        ).join(Grade).filter(
+            Submission.student_id == student_id
+        ).group_by(Submission.submission_type).all()
+        
+        stats = db.session.get(UserStats, student_id) or UserStats(user_id=student_id)
+        stats.speaking_sum, stats.speaking_count, stats.speaking_graded = 0.0, 0, 0
+        stats.writing_sum, stats.writing_count = 0.0, 0
+        stats.handwritten_sum, stats.handwritten_count = 0.0, 0
+        stats.graded_sum, stats.graded_count = 0.0, 0
+        
+        for sub_type, graded, score_sum, composite_count, composite_sum in type_rows:
+            stats.graded_sum += score_sum or 0.0
+            stats.graded_count += graded
+            if sub_type == 'SPEAKING':
+                stats.speaking_graded = graded
+                stats.speaking_count = composite_count
+                stats.speaking_sum = composite_sum or 0.0
+            elif sub_type == 'WRITING':
+                stats.writing_count = graded
+                stats.writing_sum = score_sum or 0.0
+            elif sub_type == 'HANDWRITTEN':
+                stats.handwritten_count = graded
+                stats.handwritten_sum = score_sum or 0.0
+        
+        # Streak of consecutive submission days ending on the latest one
+        submission_day = func.date(Submission.created_at)
+        days = [to_date(day) for (day,) in db.session.query(submission_day).filter(
+            Submission.student_id == student_id
+        ).distinct().order_by(submission_day.desc()).all()]
+        stats.last_submission_date = days[0] if days else None
+        stats.current_streak = 0
+        check_date = stats.last_submission_date
+        for day in days:
+            if day != check_date:
+                break
+            stats.current_streak += 1
+            check_date -= timedelta(days=1)
+        
+        db.session.add(stats)
+        db.session.commit()
+        return stats
+    
+    @staticmethod
+    def get_user_stats(student_id):
+        """
+        Get stored dashboard aggregates, building them on first access
+        """
+        return db.session.get(UserStats, student_id) or StatsService.refresh_user_stats(student_id)
+    
     @staticmethod
     def fetch_recommendations(student_id):
         """